@@ -1,8 +1,16 @@
+import os
 import re
 import json
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder if orjson isn't installed.
+    orjson = None
+
 # --- Data Structures ---
 
 # Using TypedDicts would be even better, but for a single file, this is clear enough.
@@ -15,10 +23,13 @@ class StateMachine:
     """
     Holds the structured state machine data and handles JSON serialization.
     """
-    def __init__(self, file_path: str = 'state_machine.json'):
+    __slots__ = ('file_path', 'data')
+
+    def __init__(self, file_path: str = 'state_machine.json', load_existing: bool = True):
         self.file_path = Path(file_path)
         self.data: StateMachineData = self._get_initial_structure()
-        self.load()
+        if load_existing: # Skip when the caller is about to parse a fresh design anyway.
+            self.load()
 
     def _get_initial_structure(self) -> StateMachineData:
         return {
@@ -32,8 +43,11 @@ class StateMachine:
         """Loads state machine from the JSON file if it exists."""
         if self.file_path.exists():
             try:
-                self.data = json.loads(self.file_path.read_text())
-            except json.JSONDecodeError:
+                if orjson is not None:
+                    self.data = orjson.loads(self.file_path.read_bytes())
+                else:
+                    self.data = json.loads(self.file_path.read_text())
+            except json.JSONDecodeError: # Also catches orjson.JSONDecodeError, which subclasses it.
                 print(f"Warning: Could not parse {self.file_path}, starting fresh.")
                 self.data = self._get_initial_structure()
         else:
@@ -41,7 +55,11 @@ class StateMachine:
 
     def save(self):
         """Saves the current state machine to the JSON file."""
-        self.file_path.write_text(json.dumps(self.data, indent=2))
+        if orjson is not None:
+            self.file_path.write_bytes(orjson.dumps(self.data, option=orjson.OPT_INDENT_2))
+        else:
+            with self.file_path.open('w', buffering=1 << 16) as f:
+                json.dump(self.data, f, indent=2, separators=(',', ': '))
         print(f"Agent > State machine saved to {self.file_path}")
 
     def get_all_defined_states(self) -> Set[str]:
@@ -50,36 +68,52 @@ class StateMachine:
 
     def get_all_target_states(self) -> Set[str]:
         """Returns a set of all states that are targets of a transition."""
-        targets = set()
-        
-        # Global transitions
-        for trans in self.data.get('global_transitions', []):
-            if 'target' in trans:
-                targets.add(trans['target'])
-
-        # State-specific transitions
-        for state_data in self.data.get('states', {}).values():
-            for trans in state_data.get('transitions', []):
-                if 'target' in trans:
-                    targets.add(trans['target'])
-        return targets
+        # Global and state-specific transitions, consumed by set() without per-item .add calls.
+        return set(itertools.chain(
+            (t['target'] for t in self.data.get('global_transitions', ()) if 'target' in t),
+            (
+                t['target']
+                for state_data in self.data.get('states', {}).values()
+                for t in state_data.get('transitions', ())
+                if 'target' in t
+            ),
+        ))
 
 # --- 2. DSL Parser Class ---
 
+# Compiled once at import so repeated parses don't go back through the re module cache.
+_HEADER_RE = re.compile(r'#\s*(?P<kind>FEATURE|INTENT|ASSUME):\s*(?P<val>.*)', re.IGNORECASE)
+_GLOBAL_TRANS_RE = re.compile(
+    r"ON_EVENT\((?P<event>\w+)\):\s*(DO\((?P<actions>.*?)\))?\s*->\s*TO\((?P<target>\w+)\)", re.IGNORECASE
+)
+_STATE_ITEM_RE = re.compile(r"(?P<state>\w+)\s*(\[Output:\s*(?P<outputs>.*?)\])?", re.IGNORECASE)
+_FROM_RE = re.compile(r"FROM\((?P<state>\w+)\):", re.IGNORECASE)
+_TRANS_RE = re.compile(
+    r"ON_EVENT\((?P<event>\w+)\):\s*(IF\s*\((?P<condition>.*?)\))?\s*->\s*TO\((?P<target>\w+)\)", re.IGNORECASE
+)
+_SECTION_HEADERS = frozenset({'GLOBAL_TRANSITIONS', 'STATE_LIST', 'TRANSITIONS'})
+
 class DSLParser:
     """Parses the complex, multi-section DSL into a StateMachine object."""
+    __slots__ = ('lines', 'sm', 'current_section', 'current_from_state', '_dispatch')
+
     def __init__(self, dsl_text: str, state_machine: StateMachine):
-        self.lines = dsl_text.strip().split('\n')
+        self.lines = dsl_text.splitlines()
         self.sm = state_machine
         self.current_section = None
         self.current_from_state = None
+        self._dispatch = {
+            'GLOBAL_TRANSITIONS': self._parse_global_transition,
+            'STATE_LIST': self._parse_state_list_item,
+            'TRANSITIONS': self._parse_transitions_item,
+        }
 
     def parse(self):
         """Main parsing loop."""
         for line in self.lines:
-            line = line.strip()
-            if not line:
+            if not line or line.isspace():
                 continue
+            line = line.strip()
 
             if line.startswith('#'):
                 self._parse_header(line)
@@ -92,39 +126,39 @@ class DSLParser:
             self._parse_line_in_section(line)
 
     def _parse_header(self, line: str):
-        match = re.match(r'#\s*FEATURE:\s*(.*)', line, re.IGNORECASE)
-        if match:
-            self.sm.data['header']['feature'] = match.group(1).strip()
-        match = re.match(r'#\s*INTENT:\s*(.*)', line, re.IGNORECASE)
-        if match:
-            self.sm.data['header']['intent'] = match.group(1).strip()
-        match = re.match(r'#\s*ASSUME:\s*(.*)', line, re.IGNORECASE) # Custom for assumptions
-        if match:
-            self.sm.data['assumptions'].append(match.group(1).strip())
+        match = _HEADER_RE.match(line)
+        if not match:
+            return
+        kind = match.group('kind').upper()
+        val = match.group('val').strip()
+        if kind == 'ASSUME': # Custom for assumptions
+            self.sm.data['assumptions'].append(val)
+        else:
+            self.sm.data['header'][kind.lower()] = val
 
 
     def _is_section_header(self, line: str) -> bool:
-        return line.upper().startswith(('GLOBAL_TRANSITIONS:', 'STATE_LIST:', 'TRANSITIONS:'))
+        # Cheap reject first: most lines have no ':' near the start, so skip the upper() copy.
+        if ':' not in line[:30]:
+            return False
+        head = line.split(':', 1)[0].upper()
+        return head in _SECTION_HEADERS
 
     def _set_section(self, line: str):
         self.current_section = line.upper().split(':')[0]
         self.current_from_state = None # Reset when section changes
 
     def _parse_line_in_section(self, line: str):
-        if self.current_section == 'GLOBAL_TRANSITIONS':
-            self._parse_global_transition(line)
-        elif self.current_section == 'STATE_LIST':
-            self._parse_state_list_item(line)
-        elif self.current_section == 'TRANSITIONS':
-            self._parse_transitions_item(line)
+        handler = self._dispatch.get(self.current_section)
+        if handler:
+            handler(line)
 
     def _parse_global_transition(self, line: str):
         # ON_EVENT(USER_ENTERS_MASTER_CODE): DO(STOP_ALL_TIMERS, CLEAR_ALARM) -> TO(IDLE_LOCKED)
-        pattern = r"ON_EVENT\((?P<event>\w+)\):\s*(DO\((?P<actions>.*?)\))?\s*->\s*TO\((?P<target>\w+)\)"
-        match = re.search(pattern, line, re.IGNORECASE)
+        match = _GLOBAL_TRANS_RE.search(line)
         if match:
             data = match.groupdict()
-            actions = [a.strip() for a in data.get('actions', '').split(',') if a.strip()]
+            actions = [a.strip() for a in (data['actions'] or '').split(',') if a.strip()]
             self.sm.data['global_transitions'].append({
                 "event": data['event'].upper(),
                 "actions": actions,
@@ -134,8 +168,7 @@ class DSLParser:
 
     def _parse_state_list_item(self, line: str):
         # IDLE_LOCKED  [Output: Bolt=HIGH] # Standard secured state
-        pattern = r"(?P<state>\w+)\s*(\[Output:\s*(?P<outputs>.*?)\])?"
-        match = re.search(pattern, line, re.IGNORECASE)
+        match = _STATE_ITEM_RE.search(line)
         if match:
             data = match.groupdict()
             state_name = data['state'].upper()
@@ -157,7 +190,7 @@ class DSLParser:
 
     def _parse_transitions_item(self, line: str):
         # FROM(IDLE_LOCKED):
-        from_match = re.match(r"FROM\((?P<state>\w+)\):", line, re.IGNORECASE)
+        from_match = _FROM_RE.match(line)
         if from_match:
             self.current_from_state = from_match.group('state').upper()
             return
@@ -166,8 +199,7 @@ class DSLParser:
             return # Skip lines until a FROM is declared
 
         # ON_EVENT(KEYPAD_INPUT): IF (Code == INVALID AND Attempts >= 3) -> TO(ALARM_STATE)
-        pattern = r"ON_EVENT\((?P<event>\w+)\):\s*(IF\s*\((?P<condition>.*?)\))?\s*->\s*TO\((?P<target>\w+)\)"
-        trans_match = re.search(pattern, line, re.IGNORECASE)
+        trans_match = _TRANS_RE.search(line)
         if trans_match:
             data = trans_match.groupdict()
             transition = {
@@ -180,14 +212,19 @@ class DSLParser:
                 self.sm.data['states'][self.current_from_state]['transitions'].append(transition)
 
     def _extract_comment(self, line: str) -> Optional[str]:
-        if '#' in line:
-            return line.split('#', 1)[1].strip()
-        return None
+        _, sep, comment = line.partition('#')
+        return comment.strip() if sep else None
 
 # --- 3. Validator Class (The "Critique") ---
 
+# Single-scan keyword matchers for design-intent comments.
+_FUTURE_HINT_RE = re.compile(r'v2|future')
+_CRITICAL_HINT_RE = re.compile(r'critical', re.IGNORECASE)
+
 class Validator:
     """Analyzes the state machine for errors and potential issues."""
+    __slots__ = ('sm', 'critiques')
+
     def __init__(self, state_machine: StateMachine):
         self.sm = state_machine
         self.critiques: List[str] = []
@@ -195,15 +232,16 @@ class Validator:
     def validate(self) -> List[str]:
         """Runs all validation checks."""
         self.critiques = []
-        self._check_undefined_states()
-        self._find_deadlocks()
+        # Walk every transition once; both checks below only need the set of targets.
+        reachable_targets = self.sm.get_all_target_states()
+        self._check_undefined_states(reachable_targets)
+        self._find_deadlocks(reachable_targets)
         self._check_comment_hints()
         return self.critiques
 
-    def _check_undefined_states(self):
+    def _check_undefined_states(self, target_states: Set[str]):
         """Checks if all states in transitions are defined in STATE_LIST."""
         defined_states = self.sm.get_all_defined_states()
-        target_states = self.sm.get_all_target_states()
         
         undefined = target_states - defined_states
         if undefined:
@@ -211,42 +249,32 @@ class Validator:
                 f"Undefined State Error: The following states are used in transitions but not defined in STATE_LIST: {', '.join(undefined)}. Please define them."
             )
 
-    def _find_deadlocks(self):
-        """Finds reachable states that have no outgoing transitions."""
-        defined_states = self.sm.get_all_defined_states()
-        
-        for state_name in defined_states:
-            state_data = self.sm.data['states'][state_name]
+    def _find_deadlocks(self, reachable_targets: Set[str]):
+        """
+        Finds reachable states that have no outgoing transitions.
+
+        `reachable_targets` is the incoming-edge index (every transition target), so each
+        state is a single set lookup and the whole check is O(S + T).
+        """
+        for state_name, state_data in self.sm.data['states'].items():
             has_outgoing = bool(state_data.get('transitions'))
             
-            if not has_outgoing:
-                # Is it a global target?
-                is_global_target = any(
-                    t['target'] == state_name for t in self.sm.data.get('global_transitions', [])
-                )
-                # Is it a regular target?
-                is_regular_target = any(
-                    t['target'] == state_name 
-                    for s in self.sm.data['states'].values() 
-                    for t in s.get('transitions', [])
+            if not has_outgoing and state_name in reachable_targets:
+                self.critiques.append(
+                    f"Potential Deadlock: State '{state_name}' is reachable but has no outgoing transitions. Is this an intended final state?"
                 )
 
-                if is_global_target or is_regular_target:
-                    self.critiques.append(
-                        f"Potential Deadlock: State '{state_name}' is reachable but has no outgoing transitions. Is this an intended final state?"
-                    )
-
     def _check_comment_hints(self):
         """Checks for special comments and provides feedback."""
         for state, data in self.sm.data['states'].items():
             comment = data.get('comment') or ''
-            if 'v2' in comment or 'future' in comment:
+            if _FUTURE_HINT_RE.search(comment):
                 self.critiques.append(
                     f"Future-Proofing Notice: The comment for state '{state}' ('{comment}') mentions future plans. I will keep this in mind for extensibility."
                 )
             for trans in data.get('transitions', []):
                 comment = trans.get('comment') or ''
-                if 'critical' in comment.lower():
+                if _CRITICAL_HINT_RE.search(comment):
                     self.critiques.append(
                         f"Criticality Notice: Transition from '{state}' on event '{trans['event']}' is marked as critical. I will prioritize this path."
                     )
@@ -263,29 +291,69 @@ class DigitalDesignAgent:
 
     def process_dsl_file(self, file_path: str) -> str:
         """Main processing logic for a given DSL file."""
+        return self._process_dsl_file(file_path, self.sm)
+
+    def process_dsl_files(self, file_paths: List[str]) -> List[str]:
+        """
+        Processes several independent DSL files concurrently, returning responses in input order.
+
+        Each file gets its own StateMachine, saved next to the DSL as `<name>.json`. A path
+        listed more than once is processed once. A file whose `<name>.json` is the file itself
+        (e.g. `lock.json`) or is already claimed by an earlier file in the list (e.g. `a.dsl`
+        and `a.txt`) gets an error response instead of being processed.
+        """
+        sources: Dict[Path, str] = {} # resolved DSL path -> path as given
+        outputs: Dict[Path, str] = {} # output JSON path -> DSL path that claimed it
+        errors: Dict[Path, str] = {}
+        for file_path in file_paths:
+            source = Path(file_path).resolve()
+            if source in sources:
+                continue
+            sources[source] = file_path
+            output = source.with_suffix('.json')
+            if output == source:
+                errors[source] = f"Error: Saving '{file_path}' would overwrite the DSL file itself."
+            elif output in outputs:
+                errors[source] = f"Error: '{file_path}' and '{outputs[output]}' would both be saved to '{output}'."
+            else:
+                outputs[output] = file_path
+
+        def process_one(source: Path) -> str:
+            sm = StateMachine(str(source.with_suffix('.json')), load_existing=False)
+            return self._process_dsl_file(sources[source], sm)
+
+        jobs = [source for source in sources if source not in errors]
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+            responses = dict(zip(jobs, pool.map(process_one, jobs)))
+        responses.update(errors)
+        return [responses[Path(file_path).resolve()] for file_path in file_paths]
+
+    def _process_dsl_file(self, file_path: str, sm: StateMachine) -> str:
+        # Decode the whole file up front so a bad byte fails before `sm` is touched.
         try:
-            dsl_text = Path(file_path).read_text()
+            with open(file_path, 'r', buffering=1 << 20) as dsl_file:
+                dsl_text = dsl_file.read()
         except FileNotFoundError:
             return f"Error: The file '{file_path}' was not found."
         
         # 1. Parse
-        parser = DSLParser(dsl_text, self.sm)
+        parser = DSLParser(dsl_text, sm)
         parser.parse()
         
         # 2. Validate
-        validator = Validator(self.sm)
+        validator = Validator(sm)
         critiques = validator.validate()
         
         # 3. Formulate Response
         response = "I have analyzed the DSL file. Here is my assessment:\n"
         
-        feature = self.sm.data.get('header', {}).get('feature', 'N/A')
+        feature = sm.data.get('header', {}).get('feature', 'N/A')
         response += f"\n- **Feature:** {feature}"
         
         if not critiques:
             response += "\n- **Critique:** The design looks solid. No immediate errors or deadlocks found."
             response += "\n\nI am satisfied with this specification. I have converted it to JSON and saved it."
-            self.sm.save()
+            sm.save()
         else:
             response += "\n- **Critique:** I found the following points that need your attention:\n"
             for i, critique in enumerate(critiques, 1):
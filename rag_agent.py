@@ -20,7 +20,7 @@ def parse_and_validate(dsl_file_path: str):
         print(f"Error: File '{dsl_file_path}' not found.")
         sys.exit(1)
 
-    state_machine = StateMachine()
+    state_machine = StateMachine(load_existing=False)
     parser = DSLParser(dsl_text, state_machine)
     parser.parse()
 